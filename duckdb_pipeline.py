@@ -0,0 +1,184 @@
+import duckdb
+from pathlib import Path
+
+
+# Explicit schemas for the Kaggle CSV files, mirroring the Spark schemas in main.py:
+BOOKS_SCHEMA = {
+    "ISBN": "VARCHAR",
+    "Book-Title": "VARCHAR",
+    "Book-Author": "VARCHAR",
+    "Year-Of-Publication": "VARCHAR",
+    "Publisher": "VARCHAR",
+    "Image-URL-S": "VARCHAR",
+    "Image-URL-M": "VARCHAR",
+    "Image-URL-L": "VARCHAR",
+}
+RATINGS_SCHEMA = {
+    "User-ID": "INTEGER",
+    "ISBN": "VARCHAR",
+    "Book-Rating": "SMALLINT",
+}
+USERS_SCHEMA = {
+    "User-ID": "INTEGER",
+    "Location": "VARCHAR",
+    # Ages are written as floats ("18.0"), so an integer type would reject them:
+    "Age": "DOUBLE",
+}
+
+
+class BooksPipelineDuckDB:
+    """
+    A DuckDB-based alternative to the PySpark BooksPipeline in main.py.
+
+    DuckDB parses the CSVs with its vectorized engine and executes the joins
+    and group-bys in-process, so there is no JVM boundary and no
+    serialization cost on a single node. The get_top_* methods return the
+    same pandas DataFrames as the Spark pipeline, so the show_* graph
+    methods of BooksPipeline accept them as-is.
+    """
+
+    def __init__(self):
+        """Open an in-memory DuckDB connection and set file paths to read the data."""
+        self.con = duckdb.connect()
+        self.books_csv_path = Path(__file__).parent / "bronze" / "Books.csv"
+        self.ratings_csv_path = Path(__file__).parent / "bronze" / "Ratings.csv"
+        self.users_csv_path = Path(__file__).parent / "bronze" / "Users.csv"
+
+    def load_bronze(self):
+        """Register the bronze CSV files as DuckDB views."""
+        # DuckDB rejects prepared parameters in DDL statements, so the paths
+        # (repo-internal, not user input) are inlined as literals. Explicit
+        # schemas and quoting skip type sniffing, and ignore_errors drops
+        # malformed rows like Spark's DROPMALFORMED mode:
+        for view_name, csv_path, schema in (
+            ("books", self.books_csv_path, BOOKS_SCHEMA),
+            ("ratings", self.ratings_csv_path, RATINGS_SCHEMA),
+            ("users", self.users_csv_path, USERS_SCHEMA),
+        ):
+            columns = ", ".join(
+                f"'{name}': '{dtype}'" for name, dtype in schema.items()
+            )
+            self.con.execute(
+                f"CREATE OR REPLACE VIEW {view_name} AS "
+                f"SELECT * FROM read_csv('{csv_path}', header=true, "
+                f"quote='\"', escape='\"', ignore_errors=true, "
+                f"columns={{{columns}}})"
+            )
+
+    def transform_silver(self):
+        """Transform the bronze data to create silver-level data by cleaning and filtering."""
+        self.con.execute(
+            "CREATE OR REPLACE VIEW books_silver AS SELECT * FROM books "
+            'WHERE "Book-Title" IS NOT NULL AND "Book-Author" IS NOT NULL'
+        )
+        self.con.execute(
+            "CREATE OR REPLACE VIEW ratings_silver AS SELECT * FROM ratings "
+            'WHERE "Book-Rating" BETWEEN 0 AND 10'
+        )
+        # Age is often null and only the age ranking needs it, so keep users
+        # without an age (as in the Spark pipeline):
+        self.con.execute(
+            "CREATE OR REPLACE VIEW users_silver AS SELECT * FROM users "
+            'WHERE "User-ID" IS NOT NULL AND Location IS NOT NULL'
+        )
+
+    def aggregate_gold(self):
+        """Aggregate silver data to create gold-level data."""
+        self.con.execute(
+            """
+            CREATE OR REPLACE TABLE gold_books AS
+            SELECT
+                r.ISBN,
+                COUNT(*) AS rating_count,
+                AVG("Book-Rating") AS avg_rating,
+                b."Book-Title",
+                b."Book-Author"
+            FROM ratings_silver r
+            JOIN books_silver b USING (ISBN)
+            GROUP BY r.ISBN, b."Book-Title", b."Book-Author"
+            """
+        )
+        self.con.execute(
+            """
+            CREATE OR REPLACE TABLE users_ratings AS
+            SELECT u."User-ID", u.Location, u.Age, COUNT(*) AS ratings_count
+            FROM users_silver u
+            JOIN ratings_silver r USING ("User-ID")
+            GROUP BY u."User-ID", u.Location, u.Age
+            """
+        )
+
+    def get_top_books(self, number_of_books=10):
+        """
+        Get the top most popular books based on the number of ratings.
+
+        Parameters
+        ----------
+        number_of_books : int
+            The number of top books to retrieve. Defaults to 10.
+        """
+        return self.con.execute(
+            "SELECT * FROM gold_books ORDER BY rating_count DESC LIMIT ?",
+            [number_of_books],
+        ).df()
+
+    def get_top_authors(self, number_of_authors=10):
+        """
+        Get the top most popular authors based on the number of ratings.
+
+        Parameters
+        ----------
+        number_of_authors : int
+            The number of top authors to retrieve. Defaults to 10.
+        """
+        return self.con.execute(
+            """
+            SELECT "Book-Author", SUM(rating_count) AS rating_count
+            FROM gold_books
+            GROUP BY "Book-Author"
+            ORDER BY rating_count DESC
+            LIMIT ?
+            """,
+            [number_of_authors],
+        ).df()
+
+    def get_top_locations_of_users_who_rated_books(self, number_of_locations=10):
+        """
+        Get the top locations of users who rated the books.
+
+        Parameters
+        ----------
+        number_of_locations : int
+            The number of top locations to retrieve. Defaults to 10.
+        """
+        return self.con.execute(
+            """
+            SELECT Location, SUM(ratings_count) AS user_count
+            FROM users_ratings
+            GROUP BY Location
+            ORDER BY user_count DESC
+            LIMIT ?
+            """,
+            [number_of_locations],
+        ).df()
+
+    def get_top_age_of_users_who_rated_books(self, number_of_ages=10):
+        """
+        Get the top ages of users who rated the books.
+
+        Parameters
+        ----------
+        number_of_ages : int
+            The number of top ages to retrieve. Defaults to 10.
+        """
+        return self.con.execute(
+            """
+            SELECT Age, SUM(ratings_count) AS user_count
+            FROM users_ratings
+            WHERE Age IS NOT NULL
+            GROUP BY Age
+            ORDER BY user_count DESC
+            LIMIT ?
+            """,
+            [number_of_ages],
+        ).df()
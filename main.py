@@ -1,10 +1,65 @@
+from pyspark import StorageLevel
 from pyspark.sql import SparkSession
-from pyspark.sql.functions import col, count, avg, desc
+from pyspark.sql.functions import (
+    broadcast,
+    col,
+    count,
+    avg,
+    desc,
+    grouping_id,
+    lit,
+    sum as spark_sum,
+)
+from pyspark.sql.types import (
+    DoubleType,
+    IntegerType,
+    ShortType,
+    StringType,
+    StructField,
+    StructType,
+)
+import matplotlib
+
+matplotlib.use("Agg")  # Non-interactive backend; graphs are saved, not shown
 import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
+import os
 from pathlib import Path
 import pandas as pd
 
 
+# Explicit schemas for the Kaggle CSV files, so Spark does not need an extra
+# pass over each file to infer the column types:
+BOOKS_SCHEMA = StructType(
+    [
+        StructField("ISBN", StringType()),
+        StructField("Book-Title", StringType()),
+        StructField("Book-Author", StringType()),
+        StructField("Year-Of-Publication", StringType()),
+        StructField("Publisher", StringType()),
+        StructField("Image-URL-S", StringType()),
+        StructField("Image-URL-M", StringType()),
+        StructField("Image-URL-L", StringType()),
+    ]
+)
+RATINGS_SCHEMA = StructType(
+    [
+        StructField("User-ID", IntegerType()),
+        StructField("ISBN", StringType()),
+        StructField("Book-Rating", ShortType()),
+    ]
+)
+USERS_SCHEMA = StructType(
+    [
+        StructField("User-ID", IntegerType()),
+        StructField("Location", StringType()),
+        # Ages are written as floats ("18.0"); an integer type would make
+        # every aged row malformed and DROPMALFORMED would discard it:
+        StructField("Age", DoubleType()),
+    ]
+)
+
+
 class BooksPipeline:
     """A data pipeline for processing book recommendation data using PySpark, based on task from Datascentics."""
 
@@ -17,25 +72,106 @@ class BooksPipeline:
         app_name : str
             The name of the Spark application. Defaults to "BooksPipeline".
         """
-        self.spark = SparkSession.builder.appName(app_name).getOrCreate()
+        self.spark = (
+            SparkSession.builder.appName(app_name)
+            .config("spark.sql.execution.arrow.pyspark.enabled", "true")
+            .config("spark.sql.execution.arrow.maxRecordsPerBatch", "10000")
+            # Kryo serializes faster and smaller than the default Java
+            # serializer, shrinking shuffle payloads in every groupBy/join:
+            .config("spark.serializer", "org.apache.spark.serializer.KryoSerializer")
+            .config("spark.kryo.registrationRequired", "false")
+            .config("spark.kryo.unsafe", "true")
+            .config("spark.kryoserializer.buffer.max", "512m")
+            .config("spark.driver.maxResultSize", "2g")
+            # Keep orderBy().limit(n) on the TakeOrderedAndProject path (a
+            # partition-local top-n heap plus a small merge) instead of a
+            # full global sort:
+            .config("spark.sql.execution.topKSortFallbackThreshold", "10000")
+            # Keep whole-stage codegen on and never fall back to the
+            # interpreted expression tree:
+            .config("spark.sql.codegen.wholeStage", "true")
+            .config("spark.sql.codegen.fallback", "false")
+            # Keep the two-level hash map fast path for partial aggregation,
+            # which low-cardinality keys like Book-Author benefit from:
+            .config("spark.sql.codegen.aggregate.map.twolevel.enabled", "true")
+            # Adaptive query execution: coalesce small shuffle partitions,
+            # handle skewed joins and switch to broadcast joins at runtime:
+            .config("spark.sql.adaptive.enabled", "true")
+            .config("spark.sql.adaptive.coalescePartitions.enabled", "true")
+            .config("spark.sql.adaptive.skewJoin.enabled", "true")
+            .config("spark.sql.adaptive.localShuffleReader.enabled", "true")
+            # ~150MB of data needs only a handful of 10-20MB shuffle
+            # partitions; more just adds task scheduling overhead:
+            .config("spark.sql.shuffle.partitions", "16")
+            .config("spark.default.parallelism", str(os.cpu_count()))
+            .getOrCreate()
+        )
         self.books_csv_path = Path(__file__).parent / "bronze" / "Books.csv"
         self.ratings_csv_path = Path(__file__).parent / "bronze" / "Ratings.csv"
         self.users_csv_path = Path(__file__).parent / "bronze" / "Users.csv"
 
-    def load_bronze(self):
+    def _read_bronze_table(
+        self, csv_path: Path, schema: StructType, prefer_parquet=True
+    ):
+        """
+        Read one bronze table, preferring its Parquet copy when it exists.
+
+        Parameters
+        ----------
+        csv_path : Path
+            Path to the raw CSV file.
+        schema : StructType
+            Schema used when the CSV has to be read.
+        prefer_parquet : bool
+            Whether to read the Parquet copy created by convert_bronze_to_parquet
+            when it is available. Defaults to True.
+        """
+        parquet_path = csv_path.with_suffix(".parquet")
+        if prefer_parquet and parquet_path.exists():
+            return self.spark.read.parquet(str(parquet_path))
+        return (
+            self.spark.read.option("mode", "DROPMALFORMED")
+            .option("quote", '"')
+            .option("escape", '"')
+            .csv(str(csv_path), header=True, schema=schema)
+        )
+
+    def convert_bronze_to_parquet(self):
+        """
+        Convert the bronze CSV files to Parquet files next to them.
+
+        Parquet is columnar, so later runs only read the columns they touch
+        and skip the CSV parsing entirely. load_bronze picks the Parquet
+        copies up automatically once they exist.
+        """
+        for csv_path, schema in (
+            (self.books_csv_path, BOOKS_SCHEMA),
+            (self.ratings_csv_path, RATINGS_SCHEMA),
+            (self.users_csv_path, USERS_SCHEMA),
+        ):
+            df = self._read_bronze_table(csv_path, schema, prefer_parquet=False)
+            df.write.mode("overwrite").parquet(str(csv_path.with_suffix(".parquet")))
+
+    def load_bronze(self, prefer_parquet=True):
         """
         Load data (bronze-level data) from CSV files into Spark DataFrames.
 
         Data are downloaded from https://www.kaggle.com/datasets/arashnic/book-recommendation-dataset/data
+
+        Parameters
+        ----------
+        prefer_parquet : bool
+            Whether to read the Parquet copies created by
+            convert_bronze_to_parquet when they are available. Defaults to True.
         """
-        self.books = self.spark.read.csv(
-            str(self.books_csv_path), header=True, inferSchema=True
+        self.books = self._read_bronze_table(
+            self.books_csv_path, BOOKS_SCHEMA, prefer_parquet
         )
-        self.ratings = self.spark.read.csv(
-            str(self.ratings_csv_path), header=True, inferSchema=True
+        self.ratings = self._read_bronze_table(
+            self.ratings_csv_path, RATINGS_SCHEMA, prefer_parquet
         )
-        self.users = self.spark.read.csv(
-            str(self.users_csv_path), header=True, inferSchema=True
+        self.users = self._read_bronze_table(
+            self.users_csv_path, USERS_SCHEMA, prefer_parquet
         )
 
     def transform_silver(self):
@@ -44,20 +180,80 @@ class BooksPipeline:
             subset=["Book-Title", "Book-Author"]
         )  # Drop rows with null values in Book-Title or Book-Author columns
         self.ratings_silver = self.ratings.filter(
-            (col("Book-Rating") >= 0) & (col("Book-Rating") <= 10)
-        )  # Keep only valid ratings between 0 and 10
-        self.users_silver = self.users.dropna()  # Drop rows with any null values
+            col("Book-Rating").between(0, 10)
+        ).persist(
+            StorageLevel.MEMORY_AND_DISK
+        )  # Keep only valid ratings between 0 and 10; cached because it feeds several aggregations
+        self.users_silver = self.users.dropna(
+            subset=["User-ID", "Location"]
+        )  # Age is often null in this dataset and only the age ranking needs it,
+        # so keep those users instead of dropping them for every analysis
+
+    def _users_ratings(self):
+        """
+        Join users to their per-user rating counts, for both the location and age aggregations.
+
+        Ratings are aggregated per user before the join, so the join only has
+        to shuffle one row per distinct user instead of one row per rating.
+        """
+        ratings_per_user = (
+            self.ratings_silver.select("User-ID")
+            .groupBy("User-ID")
+            .agg(count("*").alias("ratings_count"))
+        )
+        users_slim = self.users_silver.select("User-ID", "Location", "Age")
+        return users_slim.join(ratings_per_user, on="User-ID", how="inner")
 
     def aggregate_gold(self):
         """Aggregate silver data to create gold-level data."""
+        # One cube pass produces both the per-Location and the per-Age
+        # subtotals, so the two demographics getters share a single shuffle;
+        # grouping_id distinguishes the subtotal rows from groups where the
+        # data value itself is null (common for Age):
+        self.users_ratings_stats = (
+            self._users_ratings()
+            .cube("Location", "Age")
+            .agg(
+                spark_sum("ratings_count").alias("user_count"),
+                grouping_id().alias("grouping_set"),
+            )
+            .persist(StorageLevel.MEMORY_AND_DISK)
+        )
         self.gold_books = (
-            self.ratings_silver.groupBy("ISBN")
+            self.ratings_silver.select("ISBN", "Book-Rating")
+            .groupBy("ISBN")
             .agg(
-                count("Book-Rating").alias("rating_count"),
+                # The silver filter already guarantees non-null ratings, so a
+                # plain row count avoids the per-row null check of count(col):
+                count(lit(1)).alias("rating_count"),
                 avg("Book-Rating").alias("avg_rating"),
             )
-            .join(self.books_silver, on="ISBN", how="inner")
+            .join(
+                broadcast(
+                    self.books_silver.select("ISBN", "Book-Title", "Book-Author")
+                ),
+                on="ISBN",
+                how="inner",
+            )
+            .persist(StorageLevel.MEMORY_AND_DISK)
         )
+        self.gold_books.count()  # Force materialization so both get_top_* consumers hit the cache
+
+    def unpersist_cached_data(self):
+        """Release the DataFrames cached during the ETL process."""
+        self.ratings_silver.unpersist()
+        self.users_ratings_stats.unpersist()
+        self.gold_books.unpersist()
+
+    def _collect_pandas(self, df) -> pd.DataFrame:
+        """
+        Collect a DataFrame to driver-side pandas.
+
+        Single collection point for the getters: toPandas() rides the Arrow
+        batch path enabled in __init__, transferring the result as columnar
+        record batches rather than row by row through Py4J.
+        """
+        return df.toPandas()
 
     def get_top_books(self, number_of_books=10):
         """
@@ -68,10 +264,8 @@ class BooksPipeline:
         number_of_books : int
             The number of top books to retrieve. Defaults to 10.
         """
-        return (
-            self.gold_books.orderBy(desc("rating_count"))
-            .limit(number_of_books)
-            .toPandas()
+        return self._collect_pandas(
+            self.gold_books.orderBy(desc("rating_count")).limit(number_of_books)
         )
 
     def get_top_authors(self, number_of_authors=10):
@@ -83,12 +277,15 @@ class BooksPipeline:
         number_of_authors : int
             The number of top authors to retrieve. Defaults to 10.
         """
-        return (
+        # sum is commutative and associative, so HashAggregate emits partial
+        # sums per partition before the shuffle (partial_sum in the plan);
+        # keep this aggregate in the sum/count family to preserve that:
+        return self._collect_pandas(
             self.gold_books.groupBy("Book-Author")
-            .agg(count("rating_count").alias("rating_count"))
+            .agg(spark_sum("rating_count").alias("rating_count"))
             .orderBy(desc("rating_count"))
             .limit(number_of_authors)
-        ).toPandas()
+        )
 
     def get_top_locations_of_users_who_rated_books(self, number_of_locations=10):
         """
@@ -99,13 +296,14 @@ class BooksPipeline:
         number_of_locations : int
             The number of top locations to retrieve. Defaults to 10.
         """
-        return (
-            self.users_silver.join(self.ratings_silver, on="User-ID", how="inner")
-            .groupBy("Location")
-            .agg(count("User-ID").alias("user_count"))
+        return self._collect_pandas(
+            self.users_ratings_stats.filter(
+                (col("grouping_set") == 1) & col("Location").isNotNull()
+            )
+            .select("Location", "user_count")
             .orderBy(desc("user_count"))
             .limit(number_of_locations)
-        ).toPandas()
+        )
 
     def get_top_age_of_users_who_rated_books(self, number_of_ages=10):
         """
@@ -116,83 +314,90 @@ class BooksPipeline:
         number_of_ages : int
             The number of top ages to retrieve. Defaults to 10.
         """
-        return (
-            self.users_silver.join(self.ratings_silver, on="User-ID", how="inner")
-            .groupBy("Age")
-            .agg(count("User-ID").alias("user_count"))
+        return self._collect_pandas(
+            self.users_ratings_stats.filter(
+                (col("grouping_set") == 2) & col("Age").isNotNull()
+            )
+            .select("Age", "user_count")
             .orderBy(desc("user_count"))
             .limit(number_of_ages)
-        ).toPandas()
+        )
 
     def show_top_books_graph(self, top_books: pd.DataFrame):
         """
-        Show a horizontal bar graph of the top most popular books.
+        Save a horizontal bar graph of the top most popular books to top_books.png.
 
         Parameters
         ----------
         top_books : pd.DataFrame
             A DataFrame containing the top books with their rating counts.
         """
-        plt.figure(figsize=(10, 6))
-        plt.barh(top_books["Book-Title"], top_books["rating_count"])
-        plt.xlabel("Number of Ratings")
-        plt.ylabel("Book Title")
-        plt.title("Top {} Most Popular Books".format(len(top_books)))
-        plt.gca().invert_yaxis()
-        plt.show(block=True)
+        # The object-oriented API keeps the figure local, so renders are safe
+        # to run from the concurrent threads in __main__:
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.barh(top_books["Book-Title"], top_books["rating_count"])
+        ax.set_xlabel("Number of Ratings")
+        ax.set_ylabel("Book Title")
+        ax.set_title("Top {} Most Popular Books".format(len(top_books)))
+        ax.invert_yaxis()
+        fig.savefig("top_books.png", bbox_inches="tight")
+        plt.close(fig)
 
     def show_top_authors_graph(self, top_authors: pd.DataFrame):
         """
-        Show a horizontal bar graph of the top most popular authors.
+        Save a horizontal bar graph of the top most popular authors to top_authors.png.
 
         Parameters
         ----------
         top_authors : pd.DataFrame
             A DataFrame containing the top authors with their rating counts.
         """
-        plt.figure(figsize=(10, 6))
-        plt.barh(top_authors["Book-Author"], top_authors["rating_count"])
-        plt.xlabel("Number of Ratings")
-        plt.ylabel("Author")
-        plt.title("Top {} Most Popular Authors".format(len(top_authors)))
-        plt.gca().invert_yaxis()
-        plt.show(block=True)
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.barh(top_authors["Book-Author"], top_authors["rating_count"])
+        ax.set_xlabel("Number of Ratings")
+        ax.set_ylabel("Author")
+        ax.set_title("Top {} Most Popular Authors".format(len(top_authors)))
+        ax.invert_yaxis()
+        fig.savefig("top_authors.png", bbox_inches="tight")
+        plt.close(fig)
 
     def show_top_locations_of_users_graph(self, top_locations: pd.DataFrame):
         """
-        Show a horizontal bar graph of the top locations of users who rated the books.
+        Save a horizontal bar graph of the top locations of users who rated the books to top_locations.png.
 
         Parameters
         ----------
         top_locations : pd.DataFrame
             A DataFrame containing the top locations with their user counts.
         """
-        plt.figure(figsize=(10, 6))
-        plt.barh(top_locations["Location"], top_locations["user_count"])
-        plt.xlabel("Number of Users")
-        plt.ylabel("Location")
-        plt.title(
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.barh(top_locations["Location"], top_locations["user_count"])
+        ax.set_xlabel("Number of Users")
+        ax.set_ylabel("Location")
+        ax.set_title(
             "Top {} Locations of Users Who Rated Books".format(len(top_locations))
         )
-        plt.gca().invert_yaxis()
-        plt.show(block=True)
+        ax.invert_yaxis()
+        fig.savefig("top_locations.png", bbox_inches="tight")
+        plt.close(fig)
 
     def show_top_ages_of_users_graph(self, top_ages: pd.DataFrame):
         """
-        Show a horizontal bar graph of the top ages of users who rated the books.
+        Save a horizontal bar graph of the top ages of users who rated the books to top_ages.png.
 
         Parameters
         ----------
         top_ages : pd.DataFrame
             A DataFrame containing the top ages with their user counts.
         """
-        plt.figure(figsize=(10, 6))
-        plt.barh(top_ages["Age"].astype(str), top_ages["user_count"])
-        plt.xlabel("Number of Users")
-        plt.ylabel("Age")
-        plt.title("Top {} Ages of Users Who Rated Books".format(len(top_ages)))
-        plt.gca().invert_yaxis()
-        plt.show(block=True)
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.barh(top_ages["Age"].astype(str), top_ages["user_count"])
+        ax.set_xlabel("Number of Users")
+        ax.set_ylabel("Age")
+        ax.set_title("Top {} Ages of Users Who Rated Books".format(len(top_ages)))
+        ax.invert_yaxis()
+        fig.savefig("top_ages.png", bbox_inches="tight")
+        plt.close(fig)
 
 
 if __name__ == "__main__":
@@ -202,18 +407,37 @@ if __name__ == "__main__":
     pipeline.transform_silver()  # Data are transformed, cleaned and filtered
     pipeline.aggregate_gold()
 
-    # Visualization of data:
-    # Top books
-    top_books = pipeline.get_top_books(number_of_books=10)
-    pipeline.show_top_books_graph(top_books)
-    # Top authors
-    top_authors = pipeline.get_top_authors(number_of_authors=10)
-    pipeline.show_top_authors_graph(top_authors)
-    # Top locations of the users who rated the books
-    top_locations_of_users = pipeline.get_top_locations_of_users_who_rated_books(
-        number_of_locations=10
-    )
-    pipeline.show_top_locations_of_users_graph(top_locations_of_users)
-    # Top ages of the users who rated the books
-    top_ages_of_users = pipeline.get_top_age_of_users_who_rated_books(number_of_ages=10)
-    pipeline.show_top_ages_of_users_graph(top_ages_of_users)
+    # Visualization of data; the four queries are independent, so compute and
+    # render them concurrently (the Spark jobs run as separate JVM stages and
+    # the Agg backend renders without a display):
+    def render_top_books():
+        pipeline.show_top_books_graph(pipeline.get_top_books(number_of_books=10))
+
+    def render_top_authors():
+        pipeline.show_top_authors_graph(pipeline.get_top_authors(number_of_authors=10))
+
+    def render_top_locations_of_users():
+        pipeline.show_top_locations_of_users_graph(
+            pipeline.get_top_locations_of_users_who_rated_books(number_of_locations=10)
+        )
+
+    def render_top_ages_of_users():
+        pipeline.show_top_ages_of_users_graph(
+            pipeline.get_top_age_of_users_who_rated_books(number_of_ages=10)
+        )
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        renders = [
+            executor.submit(render)
+            for render in (
+                render_top_books,
+                render_top_authors,
+                render_top_locations_of_users,
+                render_top_ages_of_users,
+            )
+        ]
+        for render in renders:
+            render.result()
+
+    # Release the cached DataFrames:
+    pipeline.unpersist_cached_data()
@@ -0,0 +1,158 @@
+import polars as pl
+from pathlib import Path
+import pandas as pd
+
+
+# Explicit schemas for the Kaggle CSV files, mirroring the Spark schemas in main.py:
+BOOKS_SCHEMA = {
+    "ISBN": pl.String,
+    "Book-Title": pl.String,
+    "Book-Author": pl.String,
+    "Year-Of-Publication": pl.String,
+    "Publisher": pl.String,
+    "Image-URL-S": pl.String,
+    "Image-URL-M": pl.String,
+    "Image-URL-L": pl.String,
+}
+RATINGS_SCHEMA = {
+    "User-ID": pl.Int32,
+    "ISBN": pl.String,
+    "Book-Rating": pl.Int16,
+}
+USERS_SCHEMA = {
+    "User-ID": pl.Int32,
+    "Location": pl.String,
+    # Ages are written as floats ("18.0"); an integer type would null
+    # every value via ignore_errors:
+    "Age": pl.Float64,
+}
+
+
+class BooksPipelinePolars:
+    """
+    A Polars-based alternative to the PySpark BooksPipeline in main.py.
+
+    The dataset fits comfortably on a single node, so Polars' lazy engine
+    gives the same declarative optimizations (predicate pushdown, projection
+    pruning) without the JVM and the Python-JVM serialization boundary.
+    The get_top_* methods return the same pandas DataFrames as the Spark
+    pipeline, so the show_* graph methods of BooksPipeline accept them as-is.
+    """
+
+    def __init__(self):
+        """Set file paths to read the data."""
+        self.books_csv_path = Path(__file__).parent / "bronze" / "Books.csv"
+        self.ratings_csv_path = Path(__file__).parent / "bronze" / "Ratings.csv"
+        self.users_csv_path = Path(__file__).parent / "bronze" / "Users.csv"
+
+    def load_bronze(self):
+        """Lazily scan the bronze CSV files into Polars LazyFrames."""
+        self.books = pl.scan_csv(
+            self.books_csv_path, schema=BOOKS_SCHEMA, ignore_errors=True
+        )
+        self.ratings = pl.scan_csv(
+            self.ratings_csv_path, schema=RATINGS_SCHEMA, ignore_errors=True
+        )
+        self.users = pl.scan_csv(
+            self.users_csv_path, schema=USERS_SCHEMA, ignore_errors=True
+        )
+
+    def transform_silver(self):
+        """Transform the bronze data to create silver-level data by cleaning and filtering."""
+        self.books_silver = self.books.drop_nulls(subset=["Book-Title", "Book-Author"])
+        self.ratings_silver = self.ratings.filter(
+            pl.col("Book-Rating").is_between(0, 10)
+        )
+        # Age is often null and only the age ranking needs it, so drop nulls
+        # only on the columns the pipeline keys on (as in the Spark pipeline):
+        self.users_silver = self.users.drop_nulls(subset=["User-ID", "Location"])
+
+    def aggregate_gold(self):
+        """Aggregate silver data to create gold-level data."""
+        self.gold_books = (
+            self.ratings_silver.group_by("ISBN")
+            .agg(
+                pl.len().alias("rating_count"),
+                pl.mean("Book-Rating").alias("avg_rating"),
+            )
+            .join(
+                self.books_silver.select("ISBN", "Book-Title", "Book-Author"),
+                on="ISBN",
+                how="inner",
+            )
+        )
+        self.users_ratings = self.users_silver.select(
+            "User-ID", "Location", "Age"
+        ).join(
+            self.ratings_silver.group_by("User-ID").agg(
+                pl.len().alias("ratings_count")
+            ),
+            on="User-ID",
+            how="inner",
+        )
+
+    def _collect_pandas(self, lazy_frame: pl.LazyFrame) -> pd.DataFrame:
+        """Collect a LazyFrame with the streaming engine and convert it to pandas."""
+        return lazy_frame.collect(engine="streaming").to_pandas()
+
+    def get_top_books(self, number_of_books=10):
+        """
+        Get the top most popular books based on the number of ratings.
+
+        Parameters
+        ----------
+        number_of_books : int
+            The number of top books to retrieve. Defaults to 10.
+        """
+        return self._collect_pandas(
+            self.gold_books.sort("rating_count", descending=True).limit(number_of_books)
+        )
+
+    def get_top_authors(self, number_of_authors=10):
+        """
+        Get the top most popular authors based on the number of ratings.
+
+        Parameters
+        ----------
+        number_of_authors : int
+            The number of top authors to retrieve. Defaults to 10.
+        """
+        return self._collect_pandas(
+            self.gold_books.group_by("Book-Author")
+            .agg(pl.sum("rating_count").alias("rating_count"))
+            .sort("rating_count", descending=True)
+            .limit(number_of_authors)
+        )
+
+    def get_top_locations_of_users_who_rated_books(self, number_of_locations=10):
+        """
+        Get the top locations of users who rated the books.
+
+        Parameters
+        ----------
+        number_of_locations : int
+            The number of top locations to retrieve. Defaults to 10.
+        """
+        return self._collect_pandas(
+            self.users_ratings.group_by("Location")
+            .agg(pl.sum("ratings_count").alias("user_count"))
+            .sort("user_count", descending=True)
+            .limit(number_of_locations)
+        )
+
+    def get_top_age_of_users_who_rated_books(self, number_of_ages=10):
+        """
+        Get the top ages of users who rated the books.
+
+        Parameters
+        ----------
+        number_of_ages : int
+            The number of top ages to retrieve. Defaults to 10.
+        """
+        return self._collect_pandas(
+            self.users_ratings.drop_nulls(subset=["Age"])
+            .group_by("Age")
+            .agg(pl.sum("ratings_count").alias("user_count"))
+            .sort("user_count", descending=True)
+            .limit(number_of_ages)
+        )